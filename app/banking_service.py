@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime
 import time
 
+import numpy as np
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class TransferFeatureContext:
     amount: float
     sender_old_balance: float
@@ -37,7 +40,7 @@ def compute_transfer_feature_context(
     if sender_old_balance < amount:
         raise ValueError("Insufficient sender balance for the requested transfer amount.")
 
-    resolved_now = now or datetime.now(UTC)
+    resolved_now = now if now is not None else datetime.now(UTC)
     resolved_step = _resolve_step(step)
     return TransferFeatureContext(
         amount=float(amount),
@@ -78,9 +81,63 @@ def build_model_feature_payload(context: TransferFeatureContext) -> dict[str, fl
     }
 
 
+def build_model_feature_payload_batch(
+    contexts: Sequence[TransferFeatureContext],
+) -> dict[str, np.ndarray]:
+    """Vectorized equivalent of build_model_feature_payload for many contexts.
+
+    Returns one array per feature so batch scoring can assemble the model
+    input in a single pass instead of looping the scalar builder per row.
+    """
+    amount = np.asarray([context.amount for context in contexts], dtype=np.float64)
+    sender_old = np.asarray([context.sender_old_balance for context in contexts], dtype=np.float64)
+    receiver_old = np.asarray([context.receiver_old_balance for context in contexts], dtype=np.float64)
+    step = np.asarray([context.step for context in contexts], dtype=np.int64)
+    hour = np.asarray([context.timestamp.hour for context in contexts], dtype=np.int64)
+
+    sender_new = sender_old - amount
+    receiver_new = receiver_old + amount
+
+    amount_ratio = amount.copy()
+    np.divide(amount, sender_old, out=amount_ratio, where=sender_old > 0)
+
+    return {
+        "step": step,
+        "amount": amount,
+        "oldbalanceOrg": sender_old,
+        "newbalanceOrig": sender_new,
+        "oldbalanceDest": receiver_old,
+        "newbalanceDest": receiver_new,
+        "hour": hour,
+        "is_night": hour < 6,
+        "amount_ratio": amount_ratio,
+        "sender_balance_change": sender_old - sender_new,
+        "receiver_balance_change": receiver_new - receiver_old,
+        "orig_balance_zero": sender_old == 0,
+        "dest_balance_zero": receiver_old == 0,
+        "type_TRANSFER": np.full(amount.shape, True),
+    }
+
+
+def build_model_feature_matrix(
+    contexts: Sequence[TransferFeatureContext],
+    feature_names: Sequence[str],
+) -> np.ndarray:
+    """Stack many contexts into one (N, p) float32 matrix in model column order.
+
+    Lets bulk flows run scaler.transform and predict_proba once over all rows
+    instead of scoring each transfer through a separate 1-row call.
+    """
+    feature_arrays = build_model_feature_payload_batch(contexts)
+    matrix = np.empty((len(contexts), len(feature_names)), dtype=np.float32)
+    for column, feature_name in enumerate(feature_names):
+        matrix[:, column] = feature_arrays[feature_name]
+    return matrix
+
+
 def mask_account_number(account_number: str) -> str:
     normalized = account_number.strip()
     if len(normalized) <= 4:
         return normalized
-    return f"{'*' * (len(normalized) - 4)}{normalized[-4:]}"
+    return normalized[-4:].rjust(len(normalized), "*")
 
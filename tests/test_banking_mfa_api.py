@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import json
+import time
 import unittest
-from contextlib import contextmanager
+from contextlib import ExitStack
 from datetime import UTC, datetime
-from unittest.mock import patch
+from types import MappingProxyType
 
 import numpy as np
 from fastapi import HTTPException
@@ -14,26 +16,7 @@ from app.model_loader import ModelArtifacts
 from app.rate_limit import RateLimitSettings
 from app.risk_engine import RiskThresholds
 from app.security import AuthMode, AuthSettings
-
-
-FEATURE_NAMES = [
-    "step",
-    "amount",
-    "oldbalanceOrg",
-    "newbalanceOrig",
-    "oldbalanceDest",
-    "newbalanceDest",
-    "hour",
-    "is_night",
-    "amount_ratio",
-    "sender_balance_change",
-    "receiver_balance_change",
-    "orig_balance_zero",
-    "dest_balance_zero",
-    "type_TRANSFER",
-]
-
-JWT_AUTH_HEADERS = {"Authorization": "Bearer valid-jwt-token"}
+from tests._fixtures import FEATURE_NAMES, JWT_AUTH_HEADERS, FakeScaler, enter_patched_client
 
 TRANSFER_PAYLOAD = {
     "receiver_account_number": "9999000011",
@@ -42,18 +25,52 @@ TRANSFER_PAYLOAD = {
     "note": "MFA transfer test",
 }
 
-
-class FakeScaler:
-    def transform(self, array: np.ndarray) -> np.ndarray:
-        return array
+# Serialized once: every test posts these bodies verbatim, so there is no
+# reason to re-run json.dumps through httpx on each call.
+TRANSFER_PAYLOAD_BYTES = json.dumps(TRANSFER_PAYLOAD).encode("utf-8")
+UNSOLICITED_CODE_BYTES = json.dumps({"code": "123456"}).encode("utf-8")
+JSON_JWT_HEADERS = {**JWT_AUTH_HEADERS, "Content-Type": "application/json"}
+
+# Built once at import: the settings never vary across tests, so the patch
+# lambdas hand back the same instances instead of reconstructing them on
+# every startup call.
+DEFAULT_AUTH = AuthSettings(mode=AuthMode.JWT, api_keys=tuple())
+DEFAULT_THRESHOLDS = RiskThresholds(low=0.30, high=0.70)
+DEFAULT_RATE_LIMIT = RateLimitSettings(enabled=True, requests=60, window_seconds=60)
+DEFAULT_MFA = main_module.MfaSettings(
+    code_ttl_seconds=300,
+    max_attempts=3,
+    code_length=6,
+    enable_demo_code_in_response=True,
+    signing_secret="test-mfa-secret",
+)
+
+_NOW_ISO_CACHE: list = [0.0, ""]
+
+
+def _now_iso() -> str:
+    """UTC timestamp string with a 1ms cache.
+
+    A single logical write touches several rows; sharing one formatted
+    timestamp across them skips the repeated datetime.now calls and keeps
+    the rows consistent.
+    """
+    now = time.monotonic()
+    if now - _NOW_ISO_CACHE[0] > 0.001:
+        _NOW_ISO_CACHE[0] = now
+        _NOW_ISO_CACHE[1] = datetime.now(UTC).isoformat()
+    return _NOW_ISO_CACHE[1]
+
+
+# Every MFA scenario scores at 0.5 (medium risk), so the probability row
+# is built once and returned read-only; the scoring path only reads [0][1].
+_FAKE_PROBA = np.array([[0.5, 0.5]], dtype=np.float64)
+_FAKE_PROBA.setflags(write=False)
 
 
 class FakeModel:
-    def __init__(self, fraud_probability: float) -> None:
-        self.fraud_probability = fraud_probability
-
     def predict_proba(self, _: np.ndarray) -> np.ndarray:
-        return np.array([[1.0 - self.fraud_probability, self.fraud_probability]], dtype=np.float64)
+        return _FAKE_PROBA
 
 
 class FakeTransactionRepository:
@@ -94,56 +111,67 @@ class FakeBankingRepository:
         self.transfers: dict[str, dict] = {}
         self.challenges: dict[str, dict] = {}
         self._counter = 0
+        # One tuple-keyed lookup replaces the compound bank-code/account
+        # comparison on every receiver resolution.
+        self._accounts_by_key = {
+            (self.receiver_account["bank_code"], self.receiver_account["account_number"]): self.receiver_account,
+        }
 
     def get_or_create_user_account(self, user_id: str, email: str | None) -> dict:
         _ = email
         if user_id != "user-123":
             raise RuntimeError("Unexpected user_id")
-        return {"profile": dict(self.sender_profile), "account": dict(self.sender_account)}
+        # Read-only views guard against caller mutation without the
+        # per-call dict copies.
+        return {
+            "profile": MappingProxyType(self.sender_profile),
+            "account": MappingProxyType(self.sender_account),
+        }
 
-    def get_account_by_bank_details(self, *, bank_code: str, account_number: str) -> dict | None:
-        if bank_code == self.receiver_account["bank_code"] and account_number == self.receiver_account["account_number"]:
-            return dict(self.receiver_account)
-        return None
+    def get_account_by_bank_details(self, *, bank_code: str, account_number: str) -> MappingProxyType | None:
+        row = self._accounts_by_key.get((bank_code, account_number))
+        return MappingProxyType(row) if row else None
 
     def create_transfer_request(self, payload: dict) -> dict:
         self._counter += 1
         transfer_id = f"tr-{self._counter}"
         row = dict(payload)
         row["id"] = transfer_id
-        row["created_at"] = payload.get("created_at", datetime.now(UTC).isoformat())
-        row["updated_at"] = payload.get("updated_at", datetime.now(UTC).isoformat())
+        row["created_at"] = payload.get("created_at", _now_iso())
+        row["updated_at"] = payload.get("updated_at", _now_iso())
         self.transfers[transfer_id] = row
-        return dict(row)
+        return MappingProxyType(row)
 
-    def get_transfer_request_by_id(self, transfer_request_id: str) -> dict | None:
+    def get_transfer_request_by_id(self, transfer_request_id: str) -> MappingProxyType | None:
         row = self.transfers.get(transfer_request_id)
-        return dict(row) if row else None
+        return MappingProxyType(row) if row else None
 
-    def update_transfer_request_status(self, *, transfer_request_id: str, status: str) -> dict | None:
+    def update_transfer_request_status(self, *, transfer_request_id: str, status: str) -> MappingProxyType | None:
         row = self.transfers.get(transfer_request_id)
         if not row:
             return None
         row["status"] = status
-        row["updated_at"] = datetime.now(UTC).isoformat()
-        return dict(row)
+        row["updated_at"] = _now_iso()
+        return MappingProxyType(row)
 
-    def upsert_transfer_mfa_challenge(self, payload: dict) -> dict:
+    def upsert_transfer_mfa_challenge(self, payload: dict) -> MappingProxyType:
+        # One copy on write so caller mutations never leak in; reads below
+        # hand out views of the stored row.
         row = dict(payload)
         self.challenges[payload["transfer_request_id"]] = row
-        return dict(row)
+        return MappingProxyType(row)
 
-    def get_transfer_mfa_challenge(self, transfer_request_id: str) -> dict | None:
+    def get_transfer_mfa_challenge(self, transfer_request_id: str) -> MappingProxyType | None:
         row = self.challenges.get(transfer_request_id)
-        return dict(row) if row else None
+        return MappingProxyType(row) if row else None
 
-    def update_transfer_mfa_challenge(self, *, transfer_request_id: str, updates: dict) -> dict | None:
+    def update_transfer_mfa_challenge(self, *, transfer_request_id: str, updates: dict) -> MappingProxyType | None:
         row = self.challenges.get(transfer_request_id)
         if not row:
             return None
         row.update(updates)
-        row["updated_at"] = datetime.now(UTC).isoformat()
-        return dict(row)
+        row["updated_at"] = _now_iso()
+        return MappingProxyType(row)
 
     def execute_low_risk_transfer(
         self,
@@ -178,134 +206,108 @@ class FakeTokenVerifier:
         return {"id": "user-123", "email": "user@example.com"}
 
 
-@contextmanager
-def mfa_test_client():
-    artifacts = ModelArtifacts(
-        model=FakeModel(fraud_probability=0.5),
-        scaler=FakeScaler(),
-        feature_names=FEATURE_NAMES,
-    )
-    transaction_repository = FakeTransactionRepository()
-    banking_repository = FakeBankingRepository()
-
-    with patch.object(main_module, "load_artifacts", lambda models_dir: artifacts):
-        with patch.object(
-            main_module.SupabaseConfig,
-            "from_env",
-            classmethod(
-                lambda cls: cls(
-                    url="https://example.supabase.co",
-                    service_role_key="test-service-role-key",
-                    table_name="transactions",
-                )
-            ),
-        ):
-            with patch.object(
-                main_module,
-                "load_auth_settings",
-                lambda: AuthSettings(mode=AuthMode.JWT, api_keys=tuple()),
-            ):
-                with patch.object(main_module, "SupabaseUserTokenVerifier", lambda client: FakeTokenVerifier()):
-                    with patch.object(
-                        main_module,
-                        "_load_risk_thresholds",
-                        lambda: RiskThresholds(low=0.30, high=0.70),
-                    ):
-                        with patch.object(
-                            main_module,
-                            "_load_rate_limit_settings",
-                            lambda: RateLimitSettings(enabled=True, requests=60, window_seconds=60),
-                        ):
-                            with patch.object(
-                                main_module,
-                                "_load_demo_seed_enabled",
-                                lambda: False,
-                            ):
-                                with patch.object(
-                                    main_module,
-                                    "_load_mfa_settings",
-                                    lambda: main_module.MfaSettings(
-                                        code_ttl_seconds=300,
-                                        max_attempts=3,
-                                        code_length=6,
-                                        enable_demo_code_in_response=True,
-                                        signing_secret="test-mfa-secret",
-                                    ),
-                                ):
-                                    with patch.object(
-                                        main_module,
-                                        "SupabaseTransactionRepository",
-                                        lambda config: transaction_repository,
-                                    ):
-                                        with patch.object(
-                                            main_module,
-                                            "BankingRepository",
-                                            lambda client, config: banking_repository,
-                                        ):
-                                            with TestClient(main_module.app) as client:
-                                                yield client
-
-
 class BankingMfaApiTests(unittest.TestCase):
-    def test_mfa_flow_medium_transfer_to_completed(self) -> None:
-        with mfa_test_client() as client:
-            initiate = client.post(
-                "/banking/transfers/initiate",
-                json=TRANSFER_PAYLOAD,
-                headers=JWT_AUTH_HEADERS,
-            )
-            self.assertEqual(initiate.status_code, 200)
-            initiate_body = initiate.json()
-            self.assertTrue(initiate_body["mfa_required"])
-            self.assertEqual(initiate_body["status"], "MFA_REQUIRED")
-            transfer_id = initiate_body["transfer_id"]
-
-            challenge = client.post(
-                f"/banking/transfers/{transfer_id}/mfa/challenge",
-                headers=JWT_AUTH_HEADERS,
-            )
-            self.assertEqual(challenge.status_code, 200)
-            challenge_body = challenge.json()
-            self.assertTrue(challenge_body["mfa_required"])
-            self.assertTrue(challenge_body["demo_code"])
-            self.assertEqual(challenge_body["remaining_attempts"], 3)
-
-            wrong_verify = client.post(
-                f"/banking/transfers/{transfer_id}/mfa/verify",
-                json={"code": "000000"},
-                headers=JWT_AUTH_HEADERS,
-            )
-            self.assertEqual(wrong_verify.status_code, 401)
-            self.assertIn("attempt", wrong_verify.json()["detail"].lower())
-
-            correct_verify = client.post(
-                f"/banking/transfers/{transfer_id}/mfa/verify",
-                json={"code": challenge_body["demo_code"]},
-                headers=JWT_AUTH_HEADERS,
-            )
-            self.assertEqual(correct_verify.status_code, 200)
-            verify_body = correct_verify.json()
-            self.assertEqual(verify_body["status"], "COMPLETED")
-            self.assertFalse(verify_body["mfa_required"])
-            self.assertIn("MFA verified", verify_body["message"])
+    # One TestClient for the class: lifespan startup is the expensive part
+    # of each test, so it runs once and setUp swaps fresh repositories
+    # onto app.state between tests.
+    client: TestClient
+    banking_repository: FakeBankingRepository
+    transaction_repository: FakeTransactionRepository
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        artifacts = ModelArtifacts(model=FakeModel(), scaler=FakeScaler(), feature_names=FEATURE_NAMES)
+        cls.transaction_repository = FakeTransactionRepository()
+        cls.banking_repository = FakeBankingRepository()
+
+        overrides = {
+            "load_artifacts": lambda models_dir: artifacts,
+            "load_auth_settings": lambda: DEFAULT_AUTH,
+            "SupabaseUserTokenVerifier": lambda client: FakeTokenVerifier(),
+            "_load_risk_thresholds": lambda: DEFAULT_THRESHOLDS,
+            "_load_rate_limit_settings": lambda: DEFAULT_RATE_LIMIT,
+            "_load_demo_seed_enabled": lambda: False,
+            "_load_mfa_settings": lambda: DEFAULT_MFA,
+            "SupabaseTransactionRepository": lambda config: cls.transaction_repository,
+            "BankingRepository": lambda client, config: cls.banking_repository,
+        }
+        cls._patches = ExitStack()
+        cls.client = enter_patched_client(cls._patches, overrides)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._patches.close()
+
+    def setUp(self) -> None:
+        # Fresh repositories per test so transfers, challenges, and
+        # balances never leak between tests.
+        self.banking_repository = FakeBankingRepository()
+        self.transaction_repository = FakeTransactionRepository()
+        state = main_module.app.state
+        state.banking_repo = self.banking_repository
+        state.transaction_repo = self.transaction_repository
+
+    def test_mfa_verify_paths(self) -> None:
+        # One initiate + challenge setup shared by every verify scenario;
+        # the wrong code runs first so it consumes an attempt before the
+        # demo code completes the transfer.
+        initiate = self.client.post(
+            "/banking/transfers/initiate",
+            content=TRANSFER_PAYLOAD_BYTES,
+            headers=JSON_JWT_HEADERS,
+        )
+        self.assertEqual(initiate.status_code, 200)
+        initiate_body = initiate.json()
+        self.assertTrue(initiate_body["mfa_required"])
+        self.assertEqual(initiate_body["status"], "MFA_REQUIRED")
+        transfer_id = initiate_body["transfer_id"]
+
+        challenge = self.client.post(
+            f"/banking/transfers/{transfer_id}/mfa/challenge",
+            headers=JWT_AUTH_HEADERS,
+        )
+        self.assertEqual(challenge.status_code, 200)
+        challenge_body = challenge.json()
+        self.assertTrue(challenge_body["mfa_required"])
+        self.assertTrue(challenge_body["demo_code"])
+        self.assertEqual(challenge_body["remaining_attempts"], 3)
+
+        scenarios = (
+            ("wrong code", "000000", 401, "attempt"),
+            ("demo code", challenge_body["demo_code"], 200, "mfa verified"),
+        )
+        for scenario_name, code, expected_status, detail_fragment in scenarios:
+            with self.subTest(scenario_name):
+                verify = self.client.post(
+                    f"/banking/transfers/{transfer_id}/mfa/verify",
+                    json={"code": code},
+                    headers=JWT_AUTH_HEADERS,
+                )
+                self.assertEqual(verify.status_code, expected_status)
+                body = verify.json()
+                if expected_status == 200:
+                    self.assertEqual(body["status"], "COMPLETED")
+                    self.assertFalse(body["mfa_required"])
+                    self.assertIn(detail_fragment, body["message"].lower())
+                else:
+                    self.assertIn(detail_fragment, body["detail"].lower())
 
     def test_mfa_verify_without_challenge_fails(self) -> None:
-        with mfa_test_client() as client:
-            initiate = client.post(
-                "/banking/transfers/initiate",
-                json=TRANSFER_PAYLOAD,
-                headers=JWT_AUTH_HEADERS,
-            )
-            self.assertEqual(initiate.status_code, 200)
-            transfer_id = initiate.json()["transfer_id"]
-
-            verify = client.post(
-                f"/banking/transfers/{transfer_id}/mfa/verify",
-                json={"code": "123456"},
-                headers=JWT_AUTH_HEADERS,
-            )
-            self.assertEqual(verify.status_code, 400)
-            self.assertIn("challenge", verify.json()["detail"].lower())
+        initiate = self.client.post(
+            "/banking/transfers/initiate",
+            content=TRANSFER_PAYLOAD_BYTES,
+            headers=JSON_JWT_HEADERS,
+        )
+        self.assertEqual(initiate.status_code, 200)
+        transfer_id = initiate.json()["transfer_id"]
+
+        verify = self.client.post(
+            f"/banking/transfers/{transfer_id}/mfa/verify",
+            content=UNSOLICITED_CODE_BYTES,
+            headers=JSON_JWT_HEADERS,
+        )
+        self.assertEqual(verify.status_code, 400)
+        self.assertIn("challenge", verify.json()["detail"].lower())
 
 
 if __name__ == "__main__":
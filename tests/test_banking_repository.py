@@ -1,10 +1,38 @@
 from __future__ import annotations
 
+import ast
 import unittest
 
 from app.banking_repository import BankingConfig, BankingRepository
 from app.database import DatabaseError
 
+# The Postgres NOTICE payload embedded in the RPC error string, parsed once
+# at import with the same ast.literal_eval mechanism the repository uses;
+# the test then compares whole dicts instead of re-asserting per key.
+_SEED_PAYLOAD_TEXT = (
+    "{'seeded': True, 'message': 'Demo banking data seeded for this user.', "
+    "'bank_code': 'CAPBANK001', 'sender_balance': 21900.0, 'transfers_seeded': 6, "
+    "'blocked_transfers': 1, 'completed_transfers': 4, 'pending_mfa_transfers': 1, "
+    "'sender_account_number': '5282916446'}"
+)
+_EXPECTED_SEED_PAYLOAD = ast.literal_eval(_SEED_PAYLOAD_TEXT)
+
+_RPC_DATA_PAYLOAD = {
+    "seeded": True,
+    "message": "ok",
+    "sender_account_number": "1111222233",
+    "bank_code": "CAPBANK001",
+    "sender_balance": 100.0,
+    "transfers_seeded": 6,
+    "completed_transfers": 4,
+    "pending_mfa_transfers": 1,
+    "blocked_transfers": 1,
+}
+
+# The config is immutable for these tests, so one instance serves every
+# scenario instead of being rebuilt per repository construction.
+_SHARED_CONFIG = BankingConfig()
+
 
 class FakeRpcCall:
     def __init__(self, *, result=None, error: Exception | None = None) -> None:
@@ -36,50 +64,40 @@ class FakeClient:
 
 
 class BankingRepositoryTests(unittest.TestCase):
-    def test_seed_demo_data_parses_payload_from_exception_string(self) -> None:
-        payload_text = (
-            "{'seeded': True, 'message': 'Demo banking data seeded for this user.', "
-            "'bank_code': 'CAPBANK001', 'sender_balance': 21900.0, 'transfers_seeded': 6, "
-            "'blocked_transfers': 1, 'completed_transfers': 4, 'pending_mfa_transfers': 1, "
-            "'sender_account_number': '5282916446'}"
+    def test_seed_demo_data_outcomes(self) -> None:
+        scenarios = (
+            (
+                "payload parsed from exception string",
+                FakeClient(rpc_error=RuntimeError(_SEED_PAYLOAD_TEXT)),
+                "user-123",
+                "user@example.com",
+                _EXPECTED_SEED_PAYLOAD,
+            ),
+            (
+                "payload returned from rpc data",
+                FakeClient(rpc_result=FakeRpcResult(_RPC_DATA_PAYLOAD)),
+                "user-abc",
+                None,
+                _RPC_DATA_PAYLOAD,
+            ),
+            (
+                "unknown rpc error raises",
+                FakeClient(rpc_error=RuntimeError("unexpected rpc failure")),
+                "user-xyz",
+                None,
+                DatabaseError,
+            ),
         )
-        fake_client = FakeClient(rpc_error=RuntimeError(payload_text))
-        repo = BankingRepository(client=fake_client, config=BankingConfig())
-
-        result = repo.seed_demo_data_for_user(user_id="user-123", email="user@example.com")
-
-        self.assertTrue(result["seeded"])
-        self.assertEqual(result["bank_code"], "CAPBANK001")
-        self.assertEqual(result["transfers_seeded"], 6)
-        self.assertEqual(result["sender_account_number"], "5282916446")
-        self.assertEqual(fake_client.last_rpc_fn, "seed_demo_banking_data_for_user")
-
-    def test_seed_demo_data_returns_payload_from_rpc_data(self) -> None:
-        rpc_payload = {
-            "seeded": True,
-            "message": "ok",
-            "sender_account_number": "1111222233",
-            "bank_code": "CAPBANK001",
-            "sender_balance": 100.0,
-            "transfers_seeded": 6,
-            "completed_transfers": 4,
-            "pending_mfa_transfers": 1,
-            "blocked_transfers": 1,
-        }
-        fake_client = FakeClient(rpc_result=FakeRpcResult(rpc_payload))
-        repo = BankingRepository(client=fake_client, config=BankingConfig())
-
-        result = repo.seed_demo_data_for_user(user_id="user-abc", email=None)
-
-        self.assertEqual(result["message"], "ok")
-        self.assertEqual(result["sender_balance"], 100.0)
-
-    def test_seed_demo_data_unknown_rpc_error_raises_database_error(self) -> None:
-        fake_client = FakeClient(rpc_error=RuntimeError("unexpected rpc failure"))
-        repo = BankingRepository(client=fake_client, config=BankingConfig())
-
-        with self.assertRaises(DatabaseError):
-            repo.seed_demo_data_for_user(user_id="user-xyz", email=None)
+        for scenario_name, fake_client, user_id, email, expected in scenarios:
+            with self.subTest(scenario_name):
+                repo = BankingRepository(client=fake_client, config=_SHARED_CONFIG)
+                if isinstance(expected, type) and issubclass(expected, Exception):
+                    with self.assertRaises(expected):
+                        repo.seed_demo_data_for_user(user_id=user_id, email=email)
+                else:
+                    result = repo.seed_demo_data_for_user(user_id=user_id, email=email)
+                    self.assertEqual(result, expected)
+                self.assertEqual(fake_client.last_rpc_fn, "seed_demo_banking_data_for_user")
 
 
 if __name__ == "__main__":
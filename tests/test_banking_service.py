@@ -4,7 +4,9 @@ from datetime import UTC, datetime
 import unittest
 
 from app.banking_service import (
+    build_model_feature_matrix,
     build_model_feature_payload,
+    build_model_feature_payload_batch,
     compute_transfer_feature_context,
     mask_account_number,
 )
@@ -19,21 +21,79 @@ class BankingServiceTests(unittest.TestCase):
             now=datetime(2026, 2, 14, 2, 15, tzinfo=UTC),
             step=12,
         )
-        payload = build_model_feature_payload(context)
-
-        self.assertEqual(payload["step"], 12)
-        self.assertEqual(payload["hour"], 2)
-        self.assertTrue(payload["is_night"])
-        self.assertEqual(payload["oldbalanceOrg"], 2000.0)
-        self.assertEqual(payload["newbalanceOrig"], 1500.0)
-        self.assertEqual(payload["oldbalanceDest"], 100.0)
-        self.assertEqual(payload["newbalanceDest"], 600.0)
-        self.assertAlmostEqual(payload["amount_ratio"], 0.25, places=9)
-        self.assertEqual(payload["sender_balance_change"], 500.0)
-        self.assertEqual(payload["receiver_balance_change"], 500.0)
-        self.assertFalse(payload["orig_balance_zero"])
-        self.assertFalse(payload["dest_balance_zero"])
-        self.assertTrue(payload["type_TRANSFER"])
+        payload = dict(build_model_feature_payload(context))
+
+        # One dict comparison covers every exact-valued feature; only the
+        # derived ratio needs a tolerance check.
+        self.assertAlmostEqual(payload.pop("amount_ratio"), 0.25, places=9)
+        self.assertEqual(
+            payload,
+            {
+                "step": 12,
+                "amount": 500.0,
+                "oldbalanceOrg": 2000.0,
+                "newbalanceOrig": 1500.0,
+                "oldbalanceDest": 100.0,
+                "newbalanceDest": 600.0,
+                "hour": 2,
+                "is_night": True,
+                "sender_balance_change": 500.0,
+                "receiver_balance_change": 500.0,
+                "orig_balance_zero": False,
+                "dest_balance_zero": False,
+                "type_TRANSFER": True,
+            },
+        )
+
+    def test_batch_feature_payload_matches_scalar_builder(self) -> None:
+        contexts = [
+            compute_transfer_feature_context(
+                amount=amount,
+                sender_old_balance=2000.0,
+                receiver_old_balance=100.0,
+                now=datetime(2026, 2, 14, 2, 15, tzinfo=UTC),
+                step=12,
+            )
+            for amount in (250.0, 500.0, 1999.0)
+        ]
+
+        batch_payload = build_model_feature_payload_batch(contexts)
+
+        for index, context in enumerate(contexts):
+            scalar_payload = build_model_feature_payload(context)
+            for feature_name, expected in scalar_payload.items():
+                self.assertAlmostEqual(
+                    float(batch_payload[feature_name][index]),
+                    float(expected),
+                    places=9,
+                    msg=feature_name,
+                )
+
+    def test_feature_matrix_orders_columns_by_feature_names(self) -> None:
+        contexts = [
+            compute_transfer_feature_context(
+                amount=amount,
+                sender_old_balance=2000.0,
+                receiver_old_balance=100.0,
+                now=datetime(2026, 2, 14, 2, 15, tzinfo=UTC),
+                step=12,
+            )
+            for amount in (250.0, 500.0)
+        ]
+        feature_names = ["amount", "hour", "amount_ratio", "is_night"]
+
+        matrix = build_model_feature_matrix(contexts, feature_names)
+
+        self.assertEqual(matrix.shape, (2, 4))
+        for row_index, context in enumerate(contexts):
+            scalar_payload = build_model_feature_payload(context)
+            for column, feature_name in enumerate(feature_names):
+                self.assertAlmostEqual(
+                    float(matrix[row_index, column]),
+                    float(scalar_payload[feature_name]),
+                    places=5,
+                    msg=feature_name,
+                )
 
     def test_compute_feature_context_validates_balance(self) -> None:
         with self.assertRaises(ValueError):
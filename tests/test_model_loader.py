@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import os
+import pickle
 import tempfile
 import unittest
 from pathlib import Path
@@ -31,6 +32,12 @@ FEATURE_NAMES = [
 ]
 
 
+# Encoded once at import with compact separators; both fixture files and
+# every test reuse the same bytes, and write_bytes skips the text-codec
+# pipeline that write_text would rebuild per call.
+FEATURE_NAMES_JSON_BYTES = json.dumps(FEATURE_NAMES, separators=(",", ":")).encode("utf-8")
+
+
 class FakeModel:
     n_features_in_ = len(FEATURE_NAMES)
 
@@ -45,43 +52,94 @@ class FakeScaler:
         return array
 
 
+def _dump_fast(obj: object, path: Path) -> None:
+    # compress=0 skips zlib entirely and the newest pickle protocol is the
+    # fastest to write and re-read; these throwaway fakes are tiny either way.
+    joblib.dump(obj, path, compress=0, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _fake_joblib_load(path: Path, mmap_mode: str | None = None) -> object:
+    _ = mmap_mode
+    return FakeScaler() if "scaler" in path.name else FakeModel()
+
+
 class ModelLoaderTests(unittest.TestCase):
-    def test_load_artifacts_prefers_v1_filenames_when_present(self) -> None:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            models_dir = Path(temp_dir)
-            joblib.dump(FakeModel(), models_dir / "random_forest_model_v1.joblib")
-            joblib.dump(FakeScaler(), models_dir / "scaler_v1.joblib")
-            (models_dir / "feature_names.json").write_text(json.dumps(FEATURE_NAMES), encoding="utf-8")
-
-            with patch.dict("os.environ", {}, clear=False):
-                os.environ.pop("MODEL_FILENAME", None)
-                os.environ.pop("SCALER_FILENAME", None)
-                os.environ["FEATURE_NAMES_FILENAME"] = "feature_names.json"
-                artifacts = load_artifacts(models_dir)
+    # Filename resolution only needs the artifact files to exist; empty
+    # touched files plus a stubbed joblib.load keep pickle serialization
+    # out of those tests entirely. One class-scoped directory written once
+    # serves both resolution tests, since they load disjoint filenames.
+    models_dir: Path
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        cls.models_dir = Path(cls._temp_dir.name)
+        for joblib_filename in (
+            "random_forest_model_v1.joblib",
+            "scaler_v1.joblib",
+            "rf_custom.joblib",
+            "scaler_custom.joblib",
+        ):
+            (cls.models_dir / joblib_filename).touch()
+        (cls.models_dir / "feature_names.json").write_bytes(FEATURE_NAMES_JSON_BYTES)
+        (cls.models_dir / "feature_custom.json").write_bytes(FEATURE_NAMES_JSON_BYTES)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._temp_dir.cleanup()
 
+    def test_load_artifacts_prefers_v1_filenames_when_present(self) -> None:
+        # Swapping the whole environ mapping is one attribute assignment,
+        # versus patch.dict diffing and restoring the dict key by key; it
+        # also guarantees the filename variables are unset.
+        with patch.object(os, "environ", {"FEATURE_NAMES_FILENAME": "feature_names.json"}):
+            with patch("app.model_loader.joblib.load", side_effect=_fake_joblib_load) as fake_load:
+                artifacts = load_artifacts(self.models_dir)
+
+        loaded_paths = [call.args[0] for call in fake_load.call_args_list]
+        self.assertEqual(
+            loaded_paths,
+            [self.models_dir / "random_forest_model_v1.joblib", self.models_dir / "scaler_v1.joblib"],
+        )
         self.assertEqual(artifacts.feature_names, FEATURE_NAMES)
         self.assertTrue(hasattr(artifacts.model, "predict_proba"))
 
     def test_load_artifacts_uses_configured_filenames(self) -> None:
+        with patch.object(
+            os,
+            "environ",
+            {
+                "MODEL_FILENAME": "rf_custom.joblib",
+                "SCALER_FILENAME": "scaler_custom.joblib",
+                "FEATURE_NAMES_FILENAME": "feature_custom.json",
+            },
+        ):
+            with patch("app.model_loader.joblib.load", side_effect=_fake_joblib_load) as fake_load:
+                artifacts = load_artifacts(self.models_dir)
+
+        loaded_paths = [call.args[0] for call in fake_load.call_args_list]
+        self.assertEqual(
+            loaded_paths,
+            [self.models_dir / "rf_custom.joblib", self.models_dir / "scaler_custom.joblib"],
+        )
+        self.assertEqual(artifacts.feature_names, FEATURE_NAMES)
+        self.assertTrue(hasattr(artifacts.model, "predict_proba"))
+
+    def test_load_artifacts_round_trips_real_joblib_files(self) -> None:
+        # End-to-end coverage of the actual joblib deserialization path,
+        # kept out of the filename-resolution tests above.
         with tempfile.TemporaryDirectory() as temp_dir:
             models_dir = Path(temp_dir)
-            joblib.dump(FakeModel(), models_dir / "rf_custom.joblib")
-            joblib.dump(FakeScaler(), models_dir / "scaler_custom.joblib")
-            (models_dir / "feature_custom.json").write_text(json.dumps(FEATURE_NAMES), encoding="utf-8")
-
-            with patch.dict(
-                "os.environ",
-                {
-                    "MODEL_FILENAME": "rf_custom.joblib",
-                    "SCALER_FILENAME": "scaler_custom.joblib",
-                    "FEATURE_NAMES_FILENAME": "feature_custom.json",
-                },
-                clear=False,
-            ):
+            _dump_fast(FakeModel(), models_dir / "random_forest_model_v1.joblib")
+            _dump_fast(FakeScaler(), models_dir / "scaler_v1.joblib")
+            (models_dir / "feature_names.json").write_bytes(FEATURE_NAMES_JSON_BYTES)
+
+            with patch.object(os, "environ", {"FEATURE_NAMES_FILENAME": "feature_names.json"}):
                 artifacts = load_artifacts(models_dir)
 
         self.assertEqual(artifacts.feature_names, FEATURE_NAMES)
         self.assertTrue(hasattr(artifacts.model, "predict_proba"))
+        self.assertTrue(hasattr(artifacts.scaler, "transform"))
 
 
 if __name__ == "__main__":